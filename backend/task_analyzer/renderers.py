@@ -0,0 +1,24 @@
+"""
+orjson-backed renderer for REST framework responses.
+"""
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# Types orjson does not know (lazy strings, Decimal, ...) go through DRF's encoder
+_fallback = JSONEncoder().default
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Drop-in replacement for JSONRenderer that encodes in C via orjson."""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render data into compact UTF-8 JSON bytes."""
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=_fallback, option=self.options)
@@ -135,13 +135,20 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'task_analyzer.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'task_analyzer.parsers.ORJSONParser',
     ],
 }
 
+# Largest task list accepted by the analyze endpoint
+MAX_TASKS = int(os.environ.get('MAX_TASKS', 10000))
+
+# Processes each web worker may start for scoring large analyze payloads;
+# the total is this times the number of gunicorn workers
+ANALYZE_POOL_WORKERS = int(os.environ.get('ANALYZE_POOL_WORKERS', 2))
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = os.environ.get(
     'CORS_ALLOWED_ORIGINS',
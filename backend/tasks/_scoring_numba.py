@@ -0,0 +1,95 @@
+"""
+Optional Numba-compiled scoring kernel.
+
+Mirrors ScoringEngine.score_components_batch as an explicit loop so it runs as
+compiled code. Numba is not a hard requirement: check _NUMBA_AVAILABLE before
+calling _score_batch.
+"""
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    _NUMBA_AVAILABLE = False
+else:
+    _NUMBA_AVAILABLE = True
+
+
+if _NUMBA_AVAILABLE:
+
+    # fastmath is left off so results match the Python and NumPy paths exactly
+    @njit(cache=True)
+    def _score_batch(due, hours, importance, blocking, dep_count, weights, overdue_mult):
+        """
+        Score n tasks given their days until due, hours, importance, blocking
+        and dependency counts. weights is (urgency, importance, effort, dependency).
+        Returns (final, urgency, importance, effort, dependency) float arrays.
+        """
+        n = due.shape[0]
+        final = np.empty(n)
+        urgency = np.empty(n)
+        importance_score = np.empty(n)
+        effort = np.empty(n)
+        dependency = np.empty(n)
+
+        for i in range(n):
+            days = due[i]
+            if days < 0:
+                u = -days * 10.0 * overdue_mult
+            elif days == 0:
+                u = 100.0
+            elif days <= 1:
+                u = 90.0
+            elif days <= 3:
+                u = 70.0
+            elif days <= 7:
+                u = 50.0
+            elif days <= 14:
+                u = 30.0
+            elif days <= 30:
+                u = 15.0
+            else:
+                u = max(5.0, 30.0 - (days - 30) * 0.5)
+
+            h = hours[i]
+            if h <= 1:
+                e = 100.0
+            elif h <= 2:
+                e = 80.0
+            elif h <= 4:
+                e = 60.0
+            elif h <= 8:
+                e = 40.0
+            elif h <= 16:
+                e = 20.0
+            else:
+                e = max(5.0, 30.0 - (h - 16) * 0.5)
+
+            imp = importance[i] / 10.0 * 100.0
+
+            if dep_count[i] == 0:
+                d = 50.0
+            else:
+                blocking_score = min(100.0, 50.0 + blocking[i] * 10.0)
+                dependency_count_score = max(30.0, 70.0 - dep_count[i] * 5.0)
+                d = (blocking_score * 0.6) + (dependency_count_score * 0.4)
+
+            total = u * weights[0] + imp * weights[1] + e * weights[2] + d * weights[3]
+
+            final[i] = max(0.0, total)
+            urgency[i] = u
+            importance_score[i] = imp
+            effort[i] = e
+            dependency[i] = d
+
+        return final, urgency, importance_score, effort, dependency
+
+    # Compile (or load from cache) at import so the first request doesn't pay for it
+    _score_batch(
+        np.zeros(1, dtype=np.int64), np.zeros(1), np.ones(1),
+        np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64),
+        np.ones(4), 1.0,
+    )
+
+else:
+    _score_batch = None
@@ -1,11 +1,21 @@
 from django.apps import AppConfig
+from django.db import transaction
+from django.db.models.signals import post_migrate
+
+
+def backfill_dependency_rows(sender, using, **kwargs):
+    """Create TaskDependency rows for tasks that don't have them yet."""
+    from .models import Task
+    
+    with transaction.atomic(using=using):
+        for task in Task.unsynced().using(using).only('id', 'dependencies').iterator():
+            task.sync_dependency_rows()
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
 
-
-
-
-
+    def ready(self):
+        # Deploys run migrate, so existing databases pick up the rows without a manual step
+        post_migrate.connect(backfill_dependency_rows, sender=self)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = "Rebuild TaskDependency rows from every task's dependencies JSON."
+
+    def handle(self, *args, **options):
+        count = 0
+        with transaction.atomic():
+            for task in Task.objects.only('id', 'dependencies').iterator():
+                task.sync_dependency_rows()
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"Synced dependency rows for {count} task(s)."))
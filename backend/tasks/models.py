@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -20,10 +20,66 @@ class Task(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Serves the soonest-due, most-important-first scan in suggest_tasks
+            models.Index(fields=['due_date', '-importance'], name='task_due_importance_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Keep the JSON list and its TaskDependency rows in step
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_dependency_rows()
+
+    def dependency_ids(self):
+        """Integer task IDs in the dependencies JSON; other entries are ignored."""
+        if not isinstance(self.dependencies, list):
+            return []
+        return [dep for dep in self.dependencies if isinstance(dep, int) and not isinstance(dep, bool)]
+
+    @classmethod
+    def unsynced(cls):
+        """
+        Tasks with dependencies JSON but no TaskDependency rows, i.e. written
+        without save() (bulk_create, update, or before the table existed).
+        """
+        return cls.objects.exclude(dependencies=[]).filter(deps__isnull=True)
+
+    def sync_dependency_rows(self):
+        """
+        Mirror the dependencies JSON list into TaskDependency rows.
+        IDs that don't match an existing task are skipped.
+        """
+        wanted = set(
+            Task.objects.filter(id__in=self.dependency_ids()).values_list('id', flat=True)
+        )
+        current = set(self.deps.values_list('depends_on_id', flat=True))
+        
+        if current - wanted:
+            self.deps.filter(depends_on_id__in=current - wanted).delete()
+        if wanted - current:
+            TaskDependency.objects.bulk_create(
+                TaskDependency(task=self, depends_on_id=dep_id) for dep_id in wanted - current
+            )
+
+
+class TaskDependency(models.Model):
+    """
+    Relational copy of Task.dependencies so blocking counts can be
+    aggregated in SQL. Both foreign keys are indexed.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='deps')
+    depends_on = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='blockers')
+
+    class Meta:
+        unique_together = ('task', 'depends_on')
+
+    def __str__(self):
+        return f"{self.task_id} -> {self.depends_on_id}"
+
 
 
 
@@ -5,93 +5,215 @@ This module implements a sophisticated scoring algorithm that prioritizes tasks
 based on multiple factors including urgency, importance, effort, and dependencies.
 """
 
+import bisect
+import functools
 from datetime import date, timedelta
-from typing import List, Dict, Any, Optional
-from collections import deque
+from typing import List, Dict, Any, Optional, Set
+from collections import Counter, deque, namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; analyze_tasks falls back to per-task scoring
+    np = None
+
+from ._scoring_numba import _NUMBA_AVAILABLE, _score_batch
+
+
+# Piecewise score tables: a value <= _X_THRESH[i] (and above the previous
+# threshold) scores _X_SCORE[i]; values past the last threshold use a formula.
+_URGENCY_THRESH = (0, 1, 3, 7, 14, 30)
+_URGENCY_SCORE = (100.0, 90.0, 70.0, 50.0, 30.0, 15.0)
+
+_EFFORT_THRESH = (0, 1, 2, 4, 8, 16)
+_EFFORT_SCORE = (100.0, 100.0, 80.0, 60.0, 40.0, 20.0)
+
+# Shared default for tasks without dependencies, so lookups don't allocate a list
+_EMPTY: tuple = ()
+
+# End-of-iteration marker for the cycle DFS; None can be a stored dependency entry
+_DONE = object()
+
+# Fields every task needs; the frozenset allows one C-level subset check per task
+_REQUIRED_FIELDS = ('title', 'due_date', 'estimated_hours', 'importance')
+_REQUIRED_SET = frozenset(_REQUIRED_FIELDS)
+
+
+def _urgency_formula(days_until: int) -> float:
+    """Urgency score for a task due in days_until days (negative when overdue)."""
+    if days_until < 0:
+        # Overdue - return high negative value (will be handled separately)
+        return -abs(days_until) * 10
+    
+    i = bisect.bisect_left(_URGENCY_THRESH, days_until)
+    if i < len(_URGENCY_SCORE):
+        return _URGENCY_SCORE[i]
+    return max(5.0, 30.0 - (days_until - 30) * 0.5)
+
+
+def _effort_formula(estimated_hours: float) -> float:
+    """Effort score for a non-negative number of hours (lower effort = higher score)."""
+    i = bisect.bisect_left(_EFFORT_THRESH, estimated_hours)
+    if i < len(_EFFORT_SCORE):
+        return _EFFORT_SCORE[i]
+    return max(5.0, 30.0 - (estimated_hours - 16) * 0.5)
+
+
+# Direct-indexed tables for the common ranges: days -30..365 and whole hours
+# 0..200. Past the top of either range the formulas have already bottomed out.
+_URGENCY_LUT_OFFSET = 30
+_URGENCY_LUT = tuple(_urgency_formula(d) for d in range(-_URGENCY_LUT_OFFSET, 366))
+_EFFORT_LUT = tuple(_effort_formula(h) for h in range(0, 201))
+
+if np is not None:
+    _URGENCY_LUT_ARRAY = np.array(_URGENCY_LUT, dtype=np.float64)
+    _EFFORT_LUT_ARRAY = np.array(_EFFORT_LUT, dtype=np.float64)
+
+
+def _urgency_from_days(days_until: int) -> float:
+    """Urgency score for a task due in days_until days, from the table when in range."""
+    i = days_until + _URGENCY_LUT_OFFSET
+    if 0 <= i < len(_URGENCY_LUT):
+        return _URGENCY_LUT[i]
+    return _urgency_formula(days_until)
+
+
+def _effort_from_hours(estimated_hours: float) -> float:
+    """Effort score for estimated_hours, from the table for whole hours in range."""
+    if estimated_hours.__class__ is int and 0 <= estimated_hours < len(_EFFORT_LUT):
+        return _EFFORT_LUT[estimated_hours]
+    return _effort_formula(estimated_hours)
+
+
+@functools.lru_cache(maxsize=None)
+def _weight_vector(weights: 'WeightProfile'):
+    """The (urgency, importance, effort, dependency) weights as a read-only float64 array."""
+    vector = np.array(weights[:4], dtype=np.float64)
+    vector.flags.writeable = False
+    return vector
+
+
+# Explanation phrases per score bucket (low, moderate, high), and every
+# urgency/importance/effort combination joined up front
+_URGENCY_PHRASES = ("Low urgency (plenty of time)", "Moderate urgency", "High urgency (due soon)")
+_IMPORTANCE_PHRASES = ("Low importance", "Moderate importance", "High importance")
+_EFFORT_PHRASES = ("High effort task", "Moderate effort required", "Quick task (low effort)")
+
+_EXPL_PREFIX = {
+    (ub, ib, eb): f"{u}. {i}. {e}"
+    for ub, u in enumerate(_URGENCY_PHRASES)
+    for ib, i in enumerate(_IMPORTANCE_PHRASES)
+    for eb, e in enumerate(_EFFORT_PHRASES)
+}
+
+# Component weights of a profile, plus the multiplier applied to overdue urgency
+WeightProfile = namedtuple('WeightProfile', 'urgency importance effort dependency overdue')
+
+# Validated tasks as parallel NumPy columns (structure of arrays) for batch scoring
+TaskBatch = namedtuple('TaskBatch', 'tasks due_days hours importance blocking dep_count')
 
 
 class ScoringEngine:
     """Main scoring engine with configurable weighting profiles."""
     
+    # Below this many tasks NumPy's per-call overhead outweighs vectorization
+    BATCH_MIN_TASKS = 100
+    
     # Weighting profiles
     PROFILES = {
-        'fastest_wins': {
-            'urgency_weight': 0.2,
-            'importance_weight': 0.1,
-            'effort_weight': 0.6,  # Negative - lower effort = higher score
-            'dependency_weight': 0.1,
-            'overdue_multiplier': 2.0,
-        },
-        'high_impact': {
-            'urgency_weight': 0.2,
-            'importance_weight': 0.5,
-            'effort_weight': 0.1,
-            'dependency_weight': 0.2,
-            'overdue_multiplier': 2.5,
-        },
-        'deadline_driven': {
-            'urgency_weight': 0.6,
-            'importance_weight': 0.2,
-            'effort_weight': 0.1,
-            'dependency_weight': 0.1,
-            'overdue_multiplier': 3.0,
-        },
-        'smart_balance': {
-            'urgency_weight': 0.35,
-            'importance_weight': 0.3,
-            'effort_weight': 0.2,
-            'dependency_weight': 0.15,
-            'overdue_multiplier': 2.5,
-        },
+        'fastest_wins': WeightProfile(
+            urgency=0.2,
+            importance=0.1,
+            effort=0.6,  # Negative - lower effort = higher score
+            dependency=0.1,
+            overdue=2.0,
+        ),
+        'high_impact': WeightProfile(
+            urgency=0.2,
+            importance=0.5,
+            effort=0.1,
+            dependency=0.2,
+            overdue=2.5,
+        ),
+        'deadline_driven': WeightProfile(
+            urgency=0.6,
+            importance=0.2,
+            effort=0.1,
+            dependency=0.1,
+            overdue=3.0,
+        ),
+        'smart_balance': WeightProfile(
+            urgency=0.35,
+            importance=0.3,
+            effort=0.2,
+            dependency=0.15,
+            overdue=2.5,
+        ),
     }
 
     def __init__(self, profile: str = 'smart_balance'):
         """Initialize scoring engine with a specific profile."""
-        if profile not in self.PROFILES:
-            raise ValueError(f"Unknown profile: {profile}. Choose from {list(self.PROFILES.keys())}")
-        
         self.profile = profile
-        self.weights = self.PROFILES[profile]
+        self.weights = self.get_weights(profile)
+
+    @classmethod
+    def get_weights(cls, profile: str) -> WeightProfile:
+        """Return the weights for a profile, raising ValueError for unknown names."""
+        if profile not in cls.PROFILES:
+            raise ValueError(f"Unknown profile: {profile}. Choose from {list(cls.PROFILES.keys())}")
+        return cls.PROFILES[profile]
 
-    def detect_circular_dependencies(self, tasks: List[Dict[str, Any]]) -> Optional[List[int]]:
+    def detect_circular_dependencies(self, tasks: List[Dict[str, Any]],
+                                     graph: Optional[Dict[int, List[int]]] = None) -> Optional[List[int]]:
         """
-        Detect circular dependencies using DFS.
-        Returns a list of task IDs involved in a cycle if found, None otherwise.
+        Detect circular dependencies using an iterative three-color DFS.
+        graph maps task ID to its dependencies and is built from tasks if omitted.
+        Returns the cycle as a closed path of task IDs (e.g. [1, 2, 1]) if found,
+        None otherwise.
         """
         # Build adjacency list
-        task_map = {task['id']: task for task in tasks}
-        graph = {task['id']: task.get('dependencies', []) for task in tasks}
-        
-        # Check all nodes
+        if graph is None:
+            graph = {task['id']: task.get('dependencies') or _EMPTY for task in tasks}
+
+        # 0 = unvisited, 1 = on the current DFS path, 2 = fully explored
+        color: Dict[int, int] = {task_id: 0 for task_id in graph}
+        parent: Dict[int, int] = {}
+
         for task_id in graph:
-            visited = set()
-            rec_stack = set()
-            
-            def dfs(node):
-                if node in rec_stack:
-                    return [node]  # Found cycle
-                if node in visited:
-                    return None
-                
-                visited.add(node)
-                rec_stack.add(node)
-                
-                for dep in graph.get(node, []):
-                    if dep not in task_map:
-                        continue  # Skip invalid dependencies
-                    result = dfs(dep)
-                    if result:
-                        if node not in result:
-                            result.append(node)
-                        return result
-                
-                rec_stack.remove(node)
-                return None
-            
-            cycle = dfs(task_id)
-            if cycle:
-                return cycle
-        
+            if color[task_id] != 0:
+                continue
+
+            color[task_id] = 1
+            stack = [(task_id, iter(graph[task_id]))]
+
+            while stack:
+                node, deps = stack[-1]
+                dep = next(deps, _DONE)
+
+                if dep is _DONE:
+                    color[node] = 2
+                    stack.pop()
+                    continue
+
+                if dep not in color:
+                    continue  # Skip invalid dependencies
+
+                if color[dep] == 1:
+                    # Back edge: walk the parent chain back to the dependency,
+                    # then reverse so the path reads in dependency order
+                    cycle = [dep]
+                    x = node
+                    while x != dep:
+                        cycle.append(x)
+                        x = parent[x]
+                    cycle.append(dep)
+                    cycle.reverse()
+                    return cycle
+
+                if color[dep] == 0:
+                    color[dep] = 1
+                    parent[dep] = node
+                    stack.append((dep, iter(graph[dep])))
+
         return None
 
     def calculate_urgency_score(self, due_date: date, today: date = None) -> float:
@@ -99,25 +221,7 @@ class ScoringEngine:
         if today is None:
             today = date.today()
         
-        days_until = (due_date - today).days
-        
-        if days_until < 0:
-            # Overdue - return high negative value (will be handled separately)
-            return -abs(days_until) * 10
-        elif days_until == 0:
-            return 100.0  # Due today
-        elif days_until <= 1:
-            return 90.0
-        elif days_until <= 3:
-            return 70.0
-        elif days_until <= 7:
-            return 50.0
-        elif days_until <= 14:
-            return 30.0
-        elif days_until <= 30:
-            return 15.0
-        else:
-            return max(5.0, 30.0 - (days_until - 30) * 0.5)
+        return _urgency_from_days((due_date - today).days)
 
     def calculate_importance_score(self, importance: int) -> float:
         """Normalize importance (1-10) to 0-100 scale."""
@@ -130,34 +234,16 @@ class ScoringEngine:
         if estimated_hours < 0:
             raise ValueError(f"Estimated hours cannot be negative, got {estimated_hours}")
         
-        if estimated_hours == 0:
-            return 100.0  # Instant task
-        
         # Inverse relationship: lower hours = higher score
-        if estimated_hours <= 1:
-            return 100.0
-        elif estimated_hours <= 2:
-            return 80.0
-        elif estimated_hours <= 4:
-            return 60.0
-        elif estimated_hours <= 8:
-            return 40.0
-        elif estimated_hours <= 16:
-            return 20.0
-        else:
-            return max(5.0, 30.0 - (estimated_hours - 16) * 0.5)
+        return _effort_from_hours(estimated_hours)
 
-    def calculate_dependency_score(self, task: Dict[str, Any], tasks: List[Dict[str, Any]]) -> float:
+    def calculate_dependency_score(self, task: Dict[str, Any], blocking_count: int) -> float:
         """Calculate score boost based on dependency count and blocking status."""
-        dependencies = task.get('dependencies', [])
-        task_map = {t['id']: t for t in tasks}
+        dependencies = task.get('dependencies') or _EMPTY
         
         if not dependencies:
             return 50.0  # No dependencies - neutral score
         
-        # Count how many tasks depend on this one (blocking score)
-        blocking_count = sum(1 for t in tasks if task['id'] in t.get('dependencies', []))
-        
         # Tasks with many dependents get priority boost
         blocking_score = min(100.0, 50.0 + blocking_count * 10.0)
         
@@ -167,19 +253,42 @@ class ScoringEngine:
         # Weighted combination
         return (blocking_score * 0.6) + (dependency_count_score * 0.4)
 
-    def score_task(self, task: Dict[str, Any], tasks: List[Dict[str, Any]], today: date = None) -> Dict[str, Any]:
+    def build_context(self, tasks: List[Dict[str, Any]],
+                      blocking_count: Optional[Dict[int, int]] = None) -> Dict[str, Any]:
         """
-        Calculate comprehensive score for a single task.
-        Returns dict with score, breakdown, and explanation.
+        Precompute data shared by every task in a single analysis pass.
+        blocking_count may be supplied by callers that already know it (e.g. from
+        a database aggregate); otherwise it is counted from tasks.
+        Returns a dict with a task lookup, the dependency graph keyed by task ID
+        and how many tasks each task blocks.
         """
-        if today is None:
-            today = date.today()
+        task_by_id = {t['id']: t for t in tasks}
+        graph = {task_id: t.get('dependencies') or _EMPTY for task_id, t in task_by_id.items()}
         
-        # Validate required fields
-        required_fields = ['title', 'due_date', 'estimated_hours', 'importance']
-        for field in required_fields:
-            if field not in task:
-                raise ValueError(f"Missing required field: {field}")
+        if blocking_count is not None:
+            blocking_count = Counter(blocking_count)
+        else:
+            blocking_count = Counter()
+            for t in tasks:
+                # A task blocks each dependency once, even if listed twice
+                blocking_count.update(set(t.get('dependencies') or _EMPTY))
+        
+        return {
+            'task_by_id': task_by_id,
+            'graph': graph,
+            'blocking_count': blocking_count,
+        }
+
+    def _validate_task(self, task: Dict[str, Any]):
+        """
+        Validate the fields needed for scoring.
+        Returns (due_date, estimated_hours, importance) or raises ValueError.
+        """
+        # Validate required fields; only look for which one is missing on failure
+        if not task.keys() >= _REQUIRED_SET:
+            for field in _REQUIRED_FIELDS:
+                if field not in task:
+                    raise ValueError(f"Missing required field: {field}")
         
         # Validate and parse due_date
         if isinstance(task['due_date'], str):
@@ -200,93 +309,219 @@ class ScoringEngine:
         if not (1 <= importance <= 10):
             raise ValueError(f"importance must be between 1 and 10: {importance}")
         
+        return due_date, estimated_hours, importance
+
+    def _build_explanation(self, urgency: float, importance_score: float, effort: float,
+                           overdue_days: int, blocking: int, dependency_count: int) -> str:
+        """Generate the human-readable explanation for a scored task."""
+        ub = 0 if urgency < 30 else (1 if urgency < 70 else 2)
+        ib = 0 if importance_score < 40 else (1 if importance_score < 70 else 2)
+        eb = 0 if effort < 40 else (1 if effort < 70 else 2)
+        prefix = _EXPL_PREFIX[(ub, ib, eb)]
+        
+        overdue_head = f"⚠️ OVERDUE by {overdue_days} day(s) - CRITICAL PRIORITY. " if overdue_days else ""
+        blocking_tail = f". Blocks {blocking} other task(s)" if blocking > 0 else ""
+        deps_tail = f". Depends on {dependency_count} task(s)" if dependency_count else ""
+        
+        return f"{overdue_head}{prefix}{blocking_tail}{deps_tail}."
+
+    def _build_result(self, final_score: float, urgency: float, importance_score: float, effort: float,
+                      dependency: float, overdue_days: int, blocking: int,
+                      dependency_count: int) -> Dict[str, Any]:
+        """Assemble the score, breakdown and explanation returned for a task."""
+        return {
+            'score': round(final_score, 2),
+            'breakdown': {
+                'urgency': round(urgency, 2),
+                'importance': round(importance_score, 2),
+                'effort': round(effort, 2),
+                'dependency': round(dependency, 2),
+            },
+            'explanation': self._build_explanation(
+                urgency, importance_score, effort, overdue_days, blocking, dependency_count
+            ),
+            'is_overdue': overdue_days > 0,
+            'overdue_days': overdue_days,
+        }
+
+    def score_task(self, task: Dict[str, Any], tasks: List[Dict[str, Any]], today: date = None,
+                   ctx: Optional[Dict[str, Any]] = None,
+                   weights: Optional[WeightProfile] = None) -> Dict[str, Any]:
+        """
+        Calculate comprehensive score for a single task.
+        Pass the result of build_context(tasks) as ctx when scoring many tasks.
+        weights defaults to the engine's profile.
+        Returns dict with score, breakdown, and explanation.
+        """
+        if today is None:
+            today = date.today()
+        if ctx is None:
+            ctx = self.build_context(tasks)
+        if weights is None:
+            weights = self.weights
+        
+        due_date, estimated_hours, importance = self._validate_task(task)
+        return self._score_validated(task, due_date, estimated_hours, importance, today, ctx, weights)
+
+    def _score_validated(self, task: Dict[str, Any], due_date: date, estimated_hours: int, importance: int,
+                         today: date, ctx: Dict[str, Any], weights: WeightProfile) -> Dict[str, Any]:
+        """Score a task whose fields were already checked by _validate_task."""
+        days_until = (due_date - today).days
+        
         # Calculate component scores
-        urgency = self.calculate_urgency_score(due_date, today)
+        urgency = _urgency_from_days(days_until)
         importance_score = self.calculate_importance_score(importance)
-        effort = self.calculate_effort_score(estimated_hours)
-        dependency = self.calculate_dependency_score(task, tasks)
+        effort = _effort_from_hours(estimated_hours)
+        blocking = ctx['blocking_count'][task.get('id')]
+        dependency = self.calculate_dependency_score(task, blocking)
         
         # Check if overdue
-        is_overdue = (due_date - today).days < 0
-        overdue_days = abs((due_date - today).days) if is_overdue else 0
+        is_overdue = days_until < 0
+        overdue_days = -days_until if is_overdue else 0
+        
+        w = weights
         
         # Apply overdue multiplier if applicable
         if is_overdue:
-            urgency = abs(urgency) * self.weights['overdue_multiplier']
+            urgency = abs(urgency) * w.overdue
         
         # Calculate weighted final score
         final_score = (
-            urgency * self.weights['urgency_weight'] +
-            importance_score * self.weights['importance_weight'] +
-            effort * self.weights['effort_weight'] +
-            dependency * self.weights['dependency_weight']
+            urgency * w.urgency +
+            importance_score * w.importance +
+            effort * w.effort +
+            dependency * w.dependency
         )
         
         # Ensure score is non-negative
         final_score = max(0, final_score)
         
-        # Generate explanation
-        explanation_parts = []
-        
-        if is_overdue:
-            explanation_parts.append(f"⚠️ OVERDUE by {overdue_days} day(s) - CRITICAL PRIORITY")
-        
-        if urgency >= 70:
-            explanation_parts.append("High urgency (due soon)")
-        elif urgency >= 30:
-            explanation_parts.append("Moderate urgency")
-        else:
-            explanation_parts.append("Low urgency (plenty of time)")
-        
-        if importance_score >= 70:
-            explanation_parts.append("High importance")
-        elif importance_score >= 40:
-            explanation_parts.append("Moderate importance")
-        else:
-            explanation_parts.append("Low importance")
+        return self._build_result(
+            final_score, urgency, importance_score, effort, dependency,
+            overdue_days, blocking, len(task.get('dependencies') or _EMPTY)
+        )
+
+    def score_components_batch(self, due_days, hours, importance, blocking, dep_count,
+                               weights: Optional[WeightProfile] = None):
+        """
+        Vectorized equivalent of score_task's numeric part over NumPy arrays.
+        Returns (final, urgency, importance, effort, dependency) float arrays,
+        with the overdue multiplier already applied to urgency.
+        """
+        w = weights if weights is not None else self.weights
+        
+        # Gather from the lookup tables; clipping at the top is exact, and only
+        # tasks overdue by more than the table covers need the formula
+        overdue = due_days < 0
+        urgency = _URGENCY_LUT_ARRAY[np.clip(due_days + _URGENCY_LUT_OFFSET, 0, len(_URGENCY_LUT) - 1)]
+        urgency = np.where(due_days < -_URGENCY_LUT_OFFSET, -np.abs(due_days) * 10.0, urgency)
+        urgency = np.where(overdue, np.abs(urgency) * w.overdue, urgency)
+        
+        importance_score = importance / 10.0 * 100.0
+        
+        effort = _EFFORT_LUT_ARRAY[np.clip(hours, 0, len(_EFFORT_LUT) - 1).astype(np.int64)]
+        fractional = hours != np.floor(hours)
+        if fractional.any():
+            h = hours[fractional]
+            effort[fractional] = np.select(
+                [h <= 1, h <= 2, h <= 4, h <= 8, h <= 16],
+                [100.0, 80.0, 60.0, 40.0, 20.0],
+                default=np.maximum(5.0, 30.0 - (h - 16) * 0.5),
+            )
+        
+        blocking_score = np.minimum(100.0, 50.0 + blocking * 10.0)
+        dependency_count_score = np.maximum(30.0, 70.0 - dep_count * 5.0)
+        dependency = np.where(
+            dep_count == 0, 50.0, (blocking_score * 0.6) + (dependency_count_score * 0.4)
+        )
         
-        if effort >= 70:
-            explanation_parts.append("Quick task (low effort)")
-        elif effort >= 40:
-            explanation_parts.append("Moderate effort required")
+        # Summed term by term, in the same order as score_task: a BLAS matvec
+        # may reassociate the sum and shift rounded scores by 0.01
+        wv = _weight_vector(w)
+        final = np.maximum(
+            0.0,
+            urgency * wv[0] +
+            importance_score * wv[1] +
+            effort * wv[2] +
+            dependency * wv[3]
+        )
+        return final, urgency, importance_score, effort, dependency
+
+    def build_batch(self, valid: List[tuple], today: date,
+                    blocking_count: Dict[int, int]) -> TaskBatch:
+        """
+        Convert (task, due_date, estimated_hours, importance) tuples from
+        _validate_task into a TaskBatch of contiguous columns.
+        """
+        n = len(valid)
+        tasks = [item[0] for item in valid]
+        # Integer ordinals subtract in one vectorized pass, without a timedelta per task
+        due_ordinals = np.fromiter((item[1].toordinal() for item in valid), dtype=np.int64, count=n)
+        return TaskBatch(
+            tasks=tasks,
+            due_days=due_ordinals - today.toordinal(),
+            hours=np.fromiter((item[2] for item in valid), dtype=np.float64, count=n),
+            importance=np.fromiter((item[3] for item in valid), dtype=np.float64, count=n),
+            blocking=np.fromiter((blocking_count[task['id']] for task in tasks), dtype=np.int64, count=n),
+            dep_count=np.fromiter(
+                (len(task.get('dependencies') or _EMPTY) for task in tasks), dtype=np.int64, count=n
+            ),
+        )
+
+    def analyze_batch(self, batch: TaskBatch,
+                      weights: Optional[WeightProfile] = None) -> List[Dict[str, Any]]:
+        """
+        Score a TaskBatch in one pass, compiled with Numba when available and
+        vectorized with NumPy otherwise. Returns scored tasks in batch order.
+        """
+        w = weights if weights is not None else self.weights
+        columns = batch[1:]
+        if _NUMBA_AVAILABLE:
+            scores = _score_batch(*columns, _weight_vector(w), w.overdue)
         else:
-            explanation_parts.append("High effort task")
-        
-        deps = task.get('dependencies', [])
-        blocking = sum(1 for t in tasks if task.get('id') in t.get('dependencies', []))
-        if blocking > 0:
-            explanation_parts.append(f"Blocks {blocking} other task(s)")
-        if deps:
-            explanation_parts.append(f"Depends on {len(deps)} task(s)")
+            scores = self.score_components_batch(*columns, w)
+        final, urgency, importance_score, effort, dependency = (c.tolist() for c in scores)
+        due_days = batch.due_days.tolist()
+        blocking = batch.blocking.tolist()
+        dep_count = batch.dep_count.tolist()
         
-        explanation = ". ".join(explanation_parts) + "."
-        
-        return {
-            'score': round(final_score, 2),
-            'breakdown': {
-                'urgency': round(urgency, 2),
-                'importance': round(importance_score, 2),
-                'effort': round(effort, 2),
-                'dependency': round(dependency, 2),
-            },
-            'explanation': explanation,
-            'is_overdue': is_overdue,
-            'overdue_days': overdue_days,
-        }
+        scored_tasks = []
+        for i, task in enumerate(batch.tasks):
+            overdue_days = -due_days[i] if due_days[i] < 0 else 0
+            result = self._build_result(
+                final[i], urgency[i], importance_score[i], effort[i], dependency[i],
+                overdue_days, blocking[i], dep_count[i]
+            )
+            scored_tasks.append({
+                **task,
+                **result
+            })
+        return scored_tasks
 
-    def analyze_tasks(self, tasks: List[Dict[str, Any]], profile: str = None) -> Dict[str, Any]:
+    def analyze_tasks(self, tasks: List[Dict[str, Any]], profile: str = None,
+                      blocking_count: Optional[Dict[int, int]] = None,
+                      known_ids: Optional[Set[int]] = None,
+                      has_dependencies: Optional[bool] = None) -> Dict[str, Any]:
         """
         Analyze and score a list of tasks.
+        blocking_count optionally maps task ID to how many tasks depend on it.
+        known_ids are IDs of existing tasks not in the list (e.g. another page);
+        dependencies on them are accepted but not followed.
+        has_dependencies lets a caller that already knows whether any task has
+        dependencies skip the scan; when False the graph checks are skipped.
         Returns sorted tasks with scores and explanations.
         """
-        if profile and profile != self.profile:
-            self.profile = profile
-            self.weights = self.PROFILES[profile]
+        # Resolve the profile per call so a shared engine is never mutated
+        if profile:
+            weights = self.get_weights(profile)
+        else:
+            profile = self.profile
+            weights = self.weights
         
         if not tasks:
             return {
                 'tasks': [],
-                'profile': self.profile,
+                'profile': profile,
                 'errors': []
             }
         
@@ -295,55 +530,96 @@ class ScoringEngine:
             if 'id' not in task:
                 task['id'] = i + 1
         
-        # Check for circular dependencies
-        cycle = self.detect_circular_dependencies(tasks)
-        if cycle:
-            return {
-                'tasks': [],
-                'profile': self.profile,
-                'errors': [f"Circular dependency detected involving tasks: {cycle}"]
-            }
-        
-        # Validate dependencies exist
-        task_ids = {task['id'] for task in tasks}
         errors = []
-        for task in tasks:
-            deps = task.get('dependencies', [])
-            invalid_deps = [dep for dep in deps if dep not in task_ids]
-            if invalid_deps:
-                errors.append(f"Task '{task.get('title', task['id'])}' has invalid dependencies: {invalid_deps}")
+        if has_dependencies is None:
+            has_dependencies = any(task.get('dependencies') for task in tasks)
         
-        if errors:
-            return {
-                'tasks': [],
-                'profile': self.profile,
-                'errors': errors
-            }
-        
-        # Score all tasks
-        today = date.today()
-        scored_tasks = []
+        if has_dependencies:
+            ctx = self.build_context(tasks, blocking_count)
+            
+            # Check for circular dependencies
+            cycle = self.detect_circular_dependencies(tasks, ctx['graph'])
+            if cycle:
+                return {
+                    'tasks': [],
+                    'profile': profile,
+                    'errors': [f"Circular dependency detected involving tasks: {cycle}"]
+                }
+            
+            # Validate dependencies exist; only pinpoint the offending tasks when
+            # the single set difference finds something missing
+            all_deps = set()
+            for task in tasks:
+                all_deps.update(task.get('dependencies') or _EMPTY)
+            missing = all_deps - ctx['task_by_id'].keys()
+            if known_ids:
+                missing -= known_ids
+            
+            if missing:
+                for task in tasks:
+                    deps = task.get('dependencies') or _EMPTY
+                    invalid_deps = [dep for dep in deps if dep in missing]
+                    if invalid_deps:
+                        errors.append(f"Task '{task.get('title', task['id'])}' has invalid dependencies: {invalid_deps}")
+            
+            if errors:
+                return {
+                    'tasks': [],
+                    'profile': profile,
+                    'errors': errors
+                }
+        else:
+            # Nothing depends on anything: no cycles or dangling IDs are possible
+            ctx = {'blocking_count': Counter(blocking_count or ())}
         
+        # Validate and parse every task once; invalid tasks are reported and skipped
+        valid = []
         for task in tasks:
             try:
-                result = self.score_task(task, tasks, today)
-                scored_tasks.append({
-                    **task,
-                    **result
-                })
+                valid.append((task, *self._validate_task(task)))
             except Exception as e:
                 errors.append(f"Error scoring task '{task.get('title', task['id'])}': {str(e)}")
         
+        # Score all tasks
+        today = date.today()
+        
+        if np is not None and len(valid) >= self.BATCH_MIN_TASKS:
+            batch = self.build_batch(valid, today, ctx['blocking_count'])
+            scored_tasks = self.analyze_batch(batch, weights)
+        else:
+            scored_tasks = []
+            for task, due_date, estimated_hours, importance in valid:
+                try:
+                    result = self._score_validated(
+                        task, due_date, estimated_hours, importance, today, ctx, weights
+                    )
+                    scored_tasks.append({
+                        **task,
+                        **result
+                    })
+                except Exception as e:
+                    errors.append(f"Error scoring task '{task.get('title', task['id'])}': {str(e)}")
+        
         # Sort by score (highest first)
         scored_tasks.sort(key=lambda x: x['score'], reverse=True)
         
         return {
             'tasks': scored_tasks,
-            'profile': self.profile,
+            'profile': profile,
             'errors': errors
         }
 
 
+def analyze_in_worker(tasks: List[Dict[str, Any]], profile: str,
+                      has_dependencies: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Score tasks under a profile; a plain module-level function so it can be
+    sent to a process pool without pulling in Django.
+    """
+    return ScoringEngine(profile=profile).analyze_tasks(
+        tasks, profile=profile, has_dependencies=has_dependencies
+    )
+
 
 
 
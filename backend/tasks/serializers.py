@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Task
+from .scoring import ScoringEngine
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -11,10 +12,24 @@ class TaskSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class TaskInputSerializer(serializers.Serializer):
+    """Serializer for a single task submitted for analysis."""
+    id = serializers.IntegerField(required=False)
+    title = serializers.CharField()
+    due_date = serializers.DateField()
+    estimated_hours = serializers.IntegerField(min_value=0)
+    importance = serializers.IntegerField(min_value=1, max_value=10)
+    dependencies = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        default=list
+    )
+
+
 class TaskAnalysisInputSerializer(serializers.Serializer):
     """Serializer for task analysis input."""
-    tasks = serializers.ListField(
-        child=serializers.DictField(),
+    tasks = TaskInputSerializer(
+        many=True,
         required=True,
         help_text="List of task objects to analyze"
     )
@@ -24,6 +39,19 @@ class TaskAnalysisInputSerializer(serializers.Serializer):
         required=False,
         help_text="Scoring profile to use"
     )
+    profiles = serializers.ListField(
+        child=serializers.ChoiceField(
+            choices=['fastest_wins', 'high_impact', 'deadline_driven', 'smart_balance']
+        ),
+        required=False,
+        allow_empty=False,
+        max_length=len(ScoringEngine.PROFILES),
+        help_text="Score the same tasks under each of these profiles"
+    )
+    
+    def validate_profiles(self, value):
+        """Drop repeated names so each profile is scored once."""
+        return list(dict.fromkeys(value))
 
 
 class ScoredTaskSerializer(serializers.Serializer):
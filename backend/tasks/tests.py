@@ -1,6 +1,19 @@
-from django.test import TestCase
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
+import threading
+from unittest import mock, skipIf
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from datetime import date, timedelta
-from .scoring import ScoringEngine
+from . import views
+from .models import Task
+from .scoring import ScoringEngine, analyze_in_worker, np
 
 
 class ScoringEngineTestCase(TestCase):
@@ -240,8 +253,470 @@ class ScoringEngineTestCase(TestCase):
         # High impact should emphasize importance more
         self.assertGreater(result_impact['breakdown']['importance'] * 0.5,
                           result_fast['breakdown']['importance'] * 0.1)
+    
+    def test_circular_dependency_reports_only_cycle_members(self):
+        """Test that the reported cycle is the dependency path, excluding tasks leading into it."""
+        tasks = [
+            {'id': 1, 'title': 'Entry', 'due_date': self.today, 'estimated_hours': 1,
+             'importance': 5, 'dependencies': [2]},
+            {'id': 2, 'title': 'Cycle A', 'due_date': self.today, 'estimated_hours': 1,
+             'importance': 5, 'dependencies': [3]},
+            {'id': 3, 'title': 'Cycle B', 'due_date': self.today, 'estimated_hours': 1,
+             'importance': 5, 'dependencies': [4]},
+            {'id': 4, 'title': 'Cycle C', 'due_date': self.today, 'estimated_hours': 1,
+             'importance': 5, 'dependencies': [2]},
+        ]
+        
+        cycle = self.engine.detect_circular_dependencies(tasks)
+        
+        self.assertEqual(cycle, [2, 3, 4, 2])
+        self.assertIsNone(self.engine.detect_circular_dependencies(self.sample_tasks))
+    
+    def test_cycle_after_none_dependency_is_reported(self):
+        """Test that a None entry in stored dependencies doesn't hide a later cycle edge."""
+        tasks = [
+            {'id': 1, 'dependencies': [None, 2]},
+            {'id': 2, 'dependencies': [1]},
+        ]
+        
+        self.assertEqual(self.engine.detect_circular_dependencies(tasks), [1, 2, 1])
+    
+    def test_long_dependency_chain_is_acyclic(self):
+        """Test that a chain deeper than the recursion limit is walked without error."""
+        tasks = [{'id': i, 'dependencies': [i - 1] if i > 1 else []} for i in range(1, 5001)]
+        
+        self.assertIsNone(self.engine.detect_circular_dependencies(tasks))
+        
+        tasks[0]['dependencies'] = [5000]
+        cycle = self.engine.detect_circular_dependencies(tasks)
+        self.assertEqual(len(cycle), 5001)
+        self.assertEqual(cycle[0], cycle[-1])
+    
+    @skipIf(np is None, "NumPy is not installed")
+    def test_batch_scoring_matches_per_task_scoring(self):
+        """Test that the compiled and NumPy batch paths produce the same results as score_task."""
+        tasks = [
+            {
+                'id': i,
+                'title': f'Task {i}',
+                'due_date': self.today + timedelta(days=(i * 7) % 90 - 20),
+                'estimated_hours': (i * 3) % 25,
+                'importance': i % 10 + 1,
+                'dependencies': [i - 1] if i % 3 == 0 else []
+            }
+            for i in range(1, 41)
+        ]
+        
+        per_task = ScoringEngine(profile='smart_balance')
+        per_task.BATCH_MIN_TASKS = len(tasks) + 1
+        batched = ScoringEngine(profile='smart_balance')
+        batched.BATCH_MIN_TASKS = 1
+        expected = per_task.analyze_tasks([dict(t) for t in tasks])
+        
+        self.assertEqual(batched.analyze_tasks([dict(t) for t in tasks]), expected)
+        
+        # Without numba the NumPy implementation is the only batch path
+        with mock.patch('tasks.scoring._NUMBA_AVAILABLE', False), \
+                mock.patch('tasks.scoring._score_batch', None):
+            self.assertEqual(batched.analyze_tasks([dict(t) for t in tasks]), expected)
+    
+    def test_profile_override_does_not_mutate_engine(self):
+        """Test that passing a profile to analyze_tasks leaves the engine's own profile intact."""
+        result = self.engine.analyze_tasks(self.sample_tasks, profile='deadline_driven')
+        
+        self.assertEqual(result['profile'], 'deadline_driven')
+        self.assertEqual(self.engine.profile, 'smart_balance')
+        self.assertEqual(self.engine.weights, ScoringEngine.PROFILES['smart_balance'])
+        self.assertEqual(self.engine.analyze_tasks(self.sample_tasks)['profile'], 'smart_balance')
+
+    
+    def test_explanation_text_format(self):
+        """Test the exact wording and punctuation of a full explanation."""
+        tasks = [
+            {
+                'id': 1,
+                'title': 'Overdue blocker',
+                'due_date': self.today - timedelta(days=2),
+                'estimated_hours': 1,
+                'importance': 9,
+                'dependencies': [2]
+            },
+            {
+                'id': 2,
+                'title': 'Prerequisite',
+                'due_date': self.today + timedelta(days=60),
+                'estimated_hours': 10,
+                'importance': 2,
+                'dependencies': []
+            },
+            {
+                'id': 3,
+                'title': 'Follow-up',
+                'due_date': self.today + timedelta(days=7),
+                'estimated_hours': 3,
+                'importance': 5,
+                'dependencies': [1]
+            },
+        ]
+        
+        result = self.engine.analyze_tasks(tasks)
+        explanations = {t['id']: t['explanation'] for t in result['tasks']}
+        
+        self.assertEqual(
+            explanations[1],
+            "⚠️ OVERDUE by 2 day(s) - CRITICAL PRIORITY. Moderate urgency. High importance. "
+            "Quick task (low effort). Blocks 1 other task(s). Depends on 1 task(s)."
+        )
+        self.assertEqual(
+            explanations[2],
+            "Low urgency (plenty of time). Low importance. High effort task. Blocks 1 other task(s)."
+        )
+        self.assertEqual(
+            explanations[3],
+            "Moderate urgency. Moderate importance. Moderate effort required. Depends on 1 task(s)."
+        )
+
+class TaskDependencySyncTestCase(TestCase):
+    """Test cases for keeping TaskDependency rows in sync with Task.dependencies."""
+    
+    def test_dependency_rows_follow_json_list(self):
+        """Test that saving a task mirrors its valid dependencies into rows."""
+        today = date.today()
+        blocker = Task.objects.create(title='Blocker', due_date=today, estimated_hours=1, importance=5)
+        task = Task.objects.create(
+            title='Blocked', due_date=today, estimated_hours=1, importance=5,
+            dependencies=[blocker.id, 999]
+        )
+        
+        self.assertEqual(list(task.deps.values_list('depends_on_id', flat=True)), [blocker.id])
+        self.assertEqual(blocker.blockers.count(), 1)
+        
+        task.dependencies = []
+        task.save()
+        
+        self.assertFalse(task.deps.exists())
+    
+    def test_non_integer_dependencies_are_ignored(self):
+        """Test that non-integer JSON entries don't break saving."""
+        today = date.today()
+        blocker = Task.objects.create(title='Blocker', due_date=today, estimated_hours=1, importance=5)
+        task = Task.objects.create(
+            title='Blocked', due_date=today, estimated_hours=1, importance=5,
+            dependencies=['a', blocker.id, None]
+        )
+        
+        self.assertEqual(list(task.deps.values_list('depends_on_id', flat=True)), [blocker.id])
+        
+        response = self.client.get('/api/tasks/suggest/', {'profile': 'fastest_wins'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("invalid dependencies: ['a', None]", response.json()['details'][0])
+    
+    def test_command_backfills_rows_for_existing_tasks(self):
+        """Test that sync_task_dependencies creates rows for tasks saved before the table existed."""
+        today = date.today()
+        blocker = Task.objects.create(title='Blocker', due_date=today, estimated_hours=1, importance=5)
+        # bulk_create skips save(), like rows written before TaskDependency existed
+        Task.objects.bulk_create([
+            Task(title='Old', due_date=today, estimated_hours=1, importance=5, dependencies=[blocker.id])
+        ])
+        self.assertEqual(blocker.blockers.count(), 0)
+        
+        call_command('sync_task_dependencies', stdout=StringIO())
+        
+        self.assertEqual(blocker.blockers.count(), 1)
+    
+    def test_suggest_counts_json_before_backfill(self):
+        """Test that suggest counts dependents that have no rows alongside those that do."""
+        today = date.today()
+        blocker = Task.objects.create(title='Blocker', due_date=today, estimated_hours=1, importance=5)
+        Task.objects.create(
+            title='New', due_date=today + timedelta(days=1), estimated_hours=1, importance=5,
+            dependencies=[blocker.id]
+        )
+        Task.objects.bulk_create([
+            Task(title='Old', due_date=today + timedelta(days=2), estimated_hours=1, importance=5,
+                 dependencies=[blocker.id])
+        ])
+        
+        data = self.client.get('/api/tasks/suggest/', {'profile': 'deadline_driven'}).json()
+        
+        blocker_result = next(t for t in data['suggestions'] if t['id'] == blocker.id)
+        self.assertIn('Blocks 2', blocker_result['explanation'])
+    
+    def test_migrate_backfills_missing_rows(self):
+        """Test that the post_migrate hook creates rows for tasks that lack them."""
+        today = date.today()
+        blocker = Task.objects.create(title='Blocker', due_date=today, estimated_hours=1, importance=5)
+        Task.objects.bulk_create([
+            Task(title='Old', due_date=today, estimated_hours=1, importance=5, dependencies=[blocker.id])
+        ])
+        self.assertEqual(Task.unsynced().count(), 1)
+        
+        emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+        
+        self.assertEqual(blocker.blockers.count(), 1)
+        self.assertFalse(Task.unsynced().exists())
+
+
+class SuggestTasksViewTestCase(TestCase):
+    """Test cases for the suggest endpoint."""
+    
+    def setUp(self):
+        """Create a small chain of stored tasks."""
+        today = date.today()
+        self.first = Task.objects.create(title='First', due_date=today, estimated_hours=1, importance=5)
+        self.second = Task.objects.create(
+            title='Second', due_date=today + timedelta(days=3), estimated_hours=2, importance=6,
+            dependencies=[self.first.id]
+        )
+    
+    def test_pages_accept_dependencies_on_other_pages(self):
+        """Test that a page whose tasks depend on tasks outside it still scores."""
+        response = self.client.get('/api/tasks/suggest/', {'limit': 1, 'offset': 1})
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([t['id'] for t in data['suggestions']], [self.second.id])
+        self.assertIsNone(data['next_offset'])
+        
+        first_page = self.client.get('/api/tasks/suggest/', {'limit': 1}).json()
+        self.assertEqual(first_page['next_offset'], 1)
+        self.assertIn('Blocks 1', first_page['suggestions'][0]['explanation'])
+    
+    def test_unchanged_tasks_return_not_modified(self):
+        """Test that a matching ETag gets a 304 until a task changes."""
+        response = self.client.get('/api/tasks/suggest/')
+        etag = response['ETag']
+        
+        cached = self.client.get('/api/tasks/suggest/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        
+        self.first.importance = 9
+        self.first.save()
+        changed = self.client.get('/api/tasks/suggest/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+    
+    def test_unknown_profile_is_rejected(self):
+        """Test that an unknown profile is a client error, not a server error."""
+        response = self.client.get('/api/tasks/suggest/', {'profile': 'nope'})
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown profile', response.json()['error'])
+    
+    def test_page_query_selects_only_scoring_fields(self):
+        """Test that the page of tasks is read without unused columns."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks/suggest/', {'profile': 'high_impact'})
+        
+        self.assertEqual(response.status_code, 200)
+        page_query = next(q['sql'] for q in queries if 'ORDER BY' in q['sql'])
+        self.assertIn('"dependencies"', page_query)
+        self.assertNotIn('"created_at"', page_query)
+
+
+class AnalyzeTasksViewTestCase(TestCase):
+    """Test cases for the analyze endpoint."""
+    
+    def test_multiple_profiles_share_one_request(self):
+        """Test that each requested profile gets its own result."""
+        today = date.today()
+        payload = {
+            'tasks': [
+                {'id': 1, 'title': 'Quick', 'due_date': str(today + timedelta(days=10)),
+                 'estimated_hours': 1, 'importance': 3},
+                {'id': 2, 'title': 'Big', 'due_date': str(today + timedelta(days=10)),
+                 'estimated_hours': 20, 'importance': 10},
+            ],
+            'profiles': ['fastest_wins', 'high_impact'],
+        }
+        response = self.client.post('/api/tasks/analyze/', payload, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), {'fastest_wins', 'high_impact'})
+        self.assertEqual(data['fastest_wins']['tasks'][0]['id'], 1)
+        self.assertEqual(data['high_impact']['tasks'][0]['id'], 2)
+    
+    def test_repeated_profiles_are_scored_once(self):
+        """Test that a profile named twice is only scored once."""
+        payload = {
+            'tasks': [{'id': 1, 'title': 'Only', 'due_date': str(date.today()),
+                       'estimated_hours': 1, 'importance': 5}],
+            'profiles': ['smart_balance', 'fastest_wins', 'smart_balance'],
+        }
+        with mock.patch.object(ScoringEngine, 'analyze_tasks', autospec=True,
+                               side_effect=ScoringEngine.analyze_tasks) as analyze:
+            response = self.client.post('/api/tasks/analyze/', payload, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {'smart_balance', 'fastest_wins'})
+        self.assertEqual(analyze.call_count, 2)
+        
+        payload['profiles'] = ['smart_balance'] * (len(ScoringEngine.PROFILES) + 1)
+        response = self.client.post('/api/tasks/analyze/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+    
+    @override_settings(MAX_TASKS=2)
+    def test_oversized_task_list_is_rejected(self):
+        """Test that a task list over MAX_TASKS is refused before validation."""
+        payload = {'tasks': [{'title': 'Bad'}] * 3}
+        response = self.client.post('/api/tasks/analyze/', payload, content_type='application/json')
+        
+        self.assertEqual(response.status_code, 413)
 
 
+class FakeExecutor:
+    """Stands in for the process pool; scores in-process unless given a future to return."""
+    
+    def __init__(self, future=None):
+        self.future = future
+        self.submits = 0
+    
+    def submit(self, fn, *args):
+        self.submits += 1
+        if self.future is not None:
+            return self.future
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+    
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
 
 
+@mock.patch.object(views, 'ANALYZE_POOL_MIN_TASKS', 2)
+class AnalyzePoolTestCase(TestCase):
+    """Test cases for scoring large analyze payloads in the worker pool."""
+    
+    def setUp(self):
+        """Start each test with an empty result cache."""
+        cache.clear()
+        today = date.today()
+        self.payload = {'tasks': [
+            {'id': 1, 'title': 'A', 'due_date': str(today), 'estimated_hours': 1, 'importance': 5},
+            {'id': 2, 'title': 'B', 'due_date': str(today + timedelta(days=3)),
+             'estimated_hours': 4, 'importance': 8, 'dependencies': [1]},
+        ]}
+    
+    def post(self):
+        return self.client.post('/api/tasks/analyze/', self.payload, content_type='application/json')
+    
+    def test_pool_result_is_cached(self):
+        """Test that a repeated payload is served from the cache without a second submit."""
+        pool = FakeExecutor()
+        with mock.patch.object(views, '_executor', pool):
+            first = self.post()
+            second = self.post()
+        
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(pool.submits, 1)
+        self.assertEqual(sorted(t['id'] for t in first.json()['tasks']), [1, 2])
+    
+    @mock.patch.object(views, 'ANALYZE_POOL_TIMEOUT', 0.01)
+    def test_pool_timeout_returns_503(self):
+        """Test that a job still running past the timeout answers 503."""
+        with mock.patch.object(views, '_executor', FakeExecutor(Future())), \
+                mock.patch.dict(views._inflight, clear=True):
+            response = self.post()
+        
+        self.assertEqual(response.status_code, 503)
+    
+    def test_broken_pool_is_replaced_and_scored_in_process(self):
+        """Test that a dead worker doesn't fail the request or poison later ones."""
+        broken = Future()
+        broken.set_exception(BrokenProcessPool())
+        with mock.patch.object(views, '_executor', FakeExecutor(broken)):
+            response = self.post()
+            
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['tasks']), 2)
+            self.assertIsNone(views._executor)
+        self.assertEqual(views._inflight, {})
+    
+    def test_worker_entry_point_matches_engine(self):
+        """Test that the function sent to workers scores like the engine."""
+        tasks = [dict(task, due_date=date.fromisoformat(task['due_date'])) for task in self.payload['tasks']]
+        
+        self.assertEqual(
+            analyze_in_worker([dict(t) for t in tasks], 'high_impact'),
+            ScoringEngine().analyze_tasks([dict(t) for t in tasks], profile='high_impact')
+        )
+
 
+class DelayedExecutor(FakeExecutor):
+    """Finishes each job on a timer, so concurrent requests overlap while it runs."""
+    
+    def __init__(self, error=None):
+        super().__init__()
+        self.error = error
+    
+    def submit(self, fn, *args):
+        self.submits += 1
+        future = Future()
+        
+        def finish():
+            if self.error is not None:
+                future.set_exception(self.error)
+            else:
+                future.set_result(fn(*args))
+        
+        threading.Timer(0.3, finish).start()
+        return future
+
+
+class AnalyzeCoalescingTestCase(TestCase):
+    """Test cases for sharing one pool job between identical concurrent requests."""
+    
+    def setUp(self):
+        """Build a payload large enough for the worker pool."""
+        cache.clear()
+        today = date.today()
+        self.payload = {'tasks': [
+            {'id': i, 'title': f'Task {i}', 'due_date': str(today + timedelta(days=i % 30)),
+             'estimated_hours': i % 12, 'importance': i % 10 + 1}
+            for i in range(1, views.ANALYZE_POOL_MIN_TASKS + 1)
+        ]}
+    
+    def post_concurrently(self, count=4):
+        """Post the payload from several threads at once; returns the responses."""
+        responses = []
+        
+        def post():
+            client = Client(raise_request_exception=False)
+            responses.append(
+                client.post('/api/tasks/analyze/', self.payload, content_type='application/json')
+            )
+        
+        threads = [threading.Thread(target=post) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses
+    
+    def test_identical_requests_share_one_job(self):
+        """Test that concurrent identical payloads are scored once and get the same body."""
+        pool = DelayedExecutor()
+        with mock.patch.object(views, '_executor', pool):
+            responses = self.post_concurrently()
+        
+        self.assertEqual(pool.submits, 1)
+        self.assertEqual([r.status_code for r in responses], [200] * 4)
+        self.assertEqual(len({r.content for r in responses}), 1)
+        self.assertEqual(views._inflight, {})
+    
+    @mock.patch.object(views, 'ANALYZE_POOL_MIN_TASKS', 2)
+    def test_failed_job_is_not_left_inflight(self):
+        """Test that a job that raises is forgotten so the next request can retry."""
+        # A small payload keeps Django's 500 handling cheap
+        self.payload['tasks'] = self.payload['tasks'][:2]
+        pool = DelayedExecutor(error=RuntimeError('worker failed'))
+        with mock.patch.object(views, '_executor', pool), \
+                self.assertLogs('django.request', level='ERROR'):
+            responses = self.post_concurrently()
+        
+        self.assertEqual(pool.submits, 1)
+        self.assertEqual([r.status_code for r in responses], [500] * 4)
+        self.assertEqual(views._inflight, {})
@@ -1,17 +1,137 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import date
+from functools import lru_cache
+import hashlib
 import json
+import logging
+import multiprocessing
+import threading
 
-from .scoring import ScoringEngine
+import orjson
+
+from .scoring import ScoringEngine, analyze_in_worker
 from .serializers import (
     TaskAnalysisInputSerializer,
-    TaskAnalysisOutputSerializer,
     TaskSerializer
 )
-from .models import Task
+from .models import Task, TaskDependency
+
+
+logger = logging.getLogger(__name__)
+
+
+# Most tasks scored per suggest request, and the only fields scoring needs
+SUGGEST_MAX_TASKS = 500
+SCORING_FIELDS = ('id', 'title', 'due_date', 'estimated_hours', 'importance', 'dependencies')
+
+# Rows fetched from the database cursor at a time
+SUGGEST_CHUNK_SIZE = 200
+
+# Seconds a computed suggestion body stays in the cache for its ETag
+SUGGEST_CACHE_TIMEOUT = 300
+
+
+@lru_cache(maxsize=16)
+def get_engine(profile: str) -> ScoringEngine:
+    """Return the shared engine for a profile; analyze_tasks never mutates it."""
+    return ScoringEngine(profile=profile)
+
+
+# Payloads this large are scored in a worker process and cached by content
+ANALYZE_POOL_MIN_TASKS = 5000
+ANALYZE_POOL_TIMEOUT = 30
+ANALYZE_CACHE_TIMEOUT = 300
+
+_executor = None
+
+# Pool jobs still running, by cache key, so identical concurrent requests share one
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """
+    Create the worker pool on first use, so small deployments never start it.
+    Call with _inflight_lock held.
+    """
+    global _executor
+    if _executor is None:
+        # Spawn, not fork: a forked child inherits the web process's threads and held locks
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.ANALYZE_POOL_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+
+def _discard_executor(pool):
+    """Drop a broken pool so the next large request starts a fresh one."""
+    global _executor
+    with _inflight_lock:
+        if _executor is pool:
+            _executor = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_analysis(tasks, profile, has_dependencies=None):
+    """
+    Score validated tasks under a profile. Large payloads go to the worker
+    pool, and their result is cached under a hash of the tasks, profile
+    and date so retried submissions are not scored again; identical
+    requests arriving while one is being scored wait on the same job.
+    """
+    if len(tasks) < ANALYZE_POOL_MIN_TASKS:
+        return get_engine(profile).analyze_tasks(
+            tasks, profile=profile, has_dependencies=has_dependencies
+        )
+    
+    digest = hashlib.blake2b(
+        orjson.dumps([date.today(), profile, tasks]), digest_size=16
+    ).hexdigest()
+    key = f'analyze:{digest}'
+    result = cache.get(key)
+    if result is not None:
+        return result
+    
+    try:
+        with _inflight_lock:
+            pool = _get_executor()
+            future = _inflight.get(key)
+            submitted = future is None
+            if submitted:
+                future = pool.submit(analyze_in_worker, tasks, profile, has_dependencies)
+                _inflight[key] = future
+        if submitted:
+            # Outside the lock: the callback runs immediately if the job already finished
+            future.add_done_callback(lambda done: _finish_inflight(key, done))
+        return future.result(timeout=ANALYZE_POOL_TIMEOUT)
+    except BrokenProcessPool:
+        # A worker died (OOM, kill); replace the pool and answer this request here
+        logger.warning("analysis worker pool broke; restarting it and scoring in-process")
+        _discard_executor(pool)
+        return get_engine(profile).analyze_tasks(
+            tasks, profile=profile, has_dependencies=has_dependencies
+        )
+
+
+def _finish_inflight(key, future):
+    """Cache a finished pool job's result, then stop handing out its future."""
+    if not future.cancelled() and future.exception() is None:
+        cache.set(key, future.result(), ANALYZE_CACHE_TIMEOUT)
+    with _inflight_lock:
+        _inflight.pop(key, None)
 
 
 @api_view(['POST'])
@@ -32,11 +152,24 @@ def analyze_tasks(request):
             },
             ...
         ],
-        "profile": "smart_balance"  # optional
+        "profile": "smart_balance",  # optional
+        "profiles": ["smart_balance", "fastest_wins"]  # optional
     }
     
-    Returns sorted tasks with scores and explanations.
+    Field-level validation happens in TaskInputSerializer; validated tasks
+    have parsed due dates and default to no dependencies.
+    Returns sorted tasks with scores and explanations. When "profiles" is
+    given, the tasks are validated once and the response maps each profile
+    to its result.
     """
+    # Refuse oversized task lists before paying for field validation
+    raw_tasks = request.data.get('tasks') if isinstance(request.data, dict) else None
+    if isinstance(raw_tasks, list) and len(raw_tasks) > settings.MAX_TASKS:
+        return Response(
+            {'error': f'Too many tasks: at most {settings.MAX_TASKS} per request'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    
     serializer = TaskAnalysisInputSerializer(data=request.data)
     
     if not serializer.is_valid():
@@ -47,183 +180,189 @@ def analyze_tasks(request):
     
     tasks = serializer.validated_data['tasks']
     profile = serializer.validated_data.get('profile', 'smart_balance')
+    profiles = serializer.validated_data.get('profiles')
     
-    # Validate task structure
-    required_fields = ['title', 'due_date', 'estimated_hours', 'importance']
-    for i, task in enumerate(tasks):
-        missing = [field for field in required_fields if field not in task]
-        if missing:
-            return Response(
-                {
-                    'error': f'Task at index {i} is missing required fields',
-                    'missing_fields': missing
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Validate due_date format
-        try:
-            if isinstance(task['due_date'], str):
-                date.fromisoformat(task['due_date'])
-        except (ValueError, TypeError):
-            return Response(
-                {
-                    'error': f'Task "{task.get("title", i)}" has invalid due_date format. Use YYYY-MM-DD.',
-                    'received': task['due_date']
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Validate estimated_hours
-        if not isinstance(task['estimated_hours'], int) or task['estimated_hours'] < 0:
-            return Response(
-                {
-                    'error': f'Task "{task.get("title", i)}" has invalid estimated_hours. Must be non-negative integer.',
-                    'received': task['estimated_hours']
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Validate importance
-        if not isinstance(task['importance'], int) or not (1 <= task['importance'] <= 10):
-            return Response(
-                {
-                    'error': f'Task "{task.get("title", i)}" has invalid importance. Must be integer between 1 and 10.',
-                    'received': task['importance']
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Validate dependencies
-        if 'dependencies' in task:
-            if not isinstance(task['dependencies'], list):
+    # Flat to-do lists are the common case; check once instead of per profile
+    has_dependencies = any(task['dependencies'] for task in tasks)
+    
+    # Run analysis
+    try:
+        results = {}
+        # The validated task list is shared; only scoring re-runs per profile
+        for name in profiles or [profile]:
+            result = _run_analysis(tasks, name, has_dependencies)
+            
+            # If there are errors from scoring, return them
+            if result.get('errors'):
                 return Response(
                     {
-                        'error': f'Task "{task.get("title", i)}" has invalid dependencies. Must be a list.',
-                        'received': task['dependencies']
+                        'error': 'Scoring errors occurred',
+                        'details': result['errors']
                     },
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            # Ensure all dependencies are integers
-            for dep in task['dependencies']:
-                if not isinstance(dep, int):
-                    return Response(
-                        {
-                            'error': f'Task "{task.get("title", i)}" has invalid dependency. All dependencies must be integers.',
-                            'received': dep
-                        },
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-        else:
-            task['dependencies'] = []
-    
-    # Run analysis
-    try:
-        engine = ScoringEngine(profile=profile)
-        result = engine.analyze_tasks(tasks, profile=profile)
+            
+            # Engine output already matches TaskAnalysisOutputSerializer
+            results[name] = result
         
-        # If there are errors from scoring, return them
-        if result.get('errors'):
-            return Response(
-                {
-                    'error': 'Scoring errors occurred',
-                    'details': result['errors']
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        output_serializer = TaskAnalysisOutputSerializer(data=result)
-        if output_serializer.is_valid():
-            return Response(output_serializer.validated_data, status=status.HTTP_200_OK)
-        else:
-            return Response(
-                {'error': 'Failed to serialize output', 'details': output_serializer.errors},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        if profiles:
+            return Response(results, status=status.HTTP_200_OK)
+        return Response(results[profile], status=status.HTTP_200_OK)
     
     except ValueError as e:
         return Response(
             {'error': str(e)},
             status=status.HTTP_400_BAD_REQUEST
         )
-    except Exception as e:
+    except TimeoutError:
+        logger.warning("analyze_tasks timed out scoring %d tasks", len(tasks))
         return Response(
-            {'error': f'Internal server error: {str(e)}'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            {'error': 'Analysis timed out'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
 
 
+def _build_suggestions(limit, offset, profile):
+    """
+    Score one page of stored tasks and pick the top 3.
+    Returns (body, status_code) so the outcome can be cached as a whole.
+    """
+    # Stream one page of scoring fields only, plus one row to tell if more
+    # exist; iterator() skips the queryset result cache
+    rows = list(
+        Task.objects.order_by('due_date', '-importance', 'id')
+        .values(*SCORING_FIELDS)[offset:offset + limit + 1]
+        .iterator(chunk_size=SUGGEST_CHUNK_SIZE)
+    )
+    has_more = len(rows) > limit
+    task_list = rows[:limit]
+    
+    if not task_list:
+        return {
+            'suggestions': [],
+            'message': 'No tasks found in database. Add tasks via admin or API.'
+        }, status.HTTP_200_OK
+    
+    # Dependencies may point at tasks outside this page; those still exist
+    page_ids = {task['id'] for task in task_list}
+    page_deps = {dep for task in task_list for dep in task['dependencies']}
+    outside_ids = page_deps - page_ids
+    # Non-integer JSON entries can't match a task; the engine reports them as invalid
+    lookup_ids = {dep for dep in outside_ids if isinstance(dep, int)}
+    known_ids = set(
+        Task.objects.filter(id__in=lookup_ids).values_list('id', flat=True)
+    ) if lookup_ids else set()
+    
+    # Count dependents per task with an indexed GROUP BY instead of scanning JSON
+    blocking_count = Counter(dict(
+        TaskDependency.objects.filter(depends_on__in=page_ids)
+        .values_list('depends_on').annotate(blocking=Count('id'))
+    ))
+    # Tasks written without save() have no rows yet; count their JSON entries instead
+    blocking_count.update(
+        dep
+        for deps in Task.unsynced().values_list('dependencies', flat=True)
+        if isinstance(deps, list)
+        for dep in {d for d in deps if isinstance(d, int) and not isinstance(d, bool)} & page_ids
+    )
+    
+    # Score tasks
+    engine = get_engine(profile)
+    result = engine.analyze_tasks(
+        task_list, profile=profile, blocking_count=blocking_count, known_ids=known_ids,
+        has_dependencies=bool(page_deps)
+    )
+    
+    if result.get('errors'):
+        return {
+            'error': 'Error analyzing tasks',
+            'details': result['errors']
+        }, status.HTTP_400_BAD_REQUEST
+    
+    # Get top 3
+    top_tasks = result['tasks'][:3]
+    
+    # Generate summary explanation
+    if top_tasks:
+        summary = " ".join(
+            f"{i}. {task['title']}: {task['explanation']}" for i, task in enumerate(top_tasks, 1)
+        )
+    else:
+        summary = "No tasks available for suggestions."
+    
+    return {
+        'suggestions': top_tasks,
+        'summary': summary,
+        'profile': result['profile'],
+        'next_offset': offset + limit if has_more else None
+    }, status.HTTP_200_OK
+
+
 @api_view(['GET'])
 def suggest_tasks(request):
     """
     Get top 3 task suggestions from database.
+    
+    Tasks are read a page at a time, soonest due first; use the optional
+    "limit" (max 500) and "offset" query params to move through the table.
+    Responses carry an ETag: send it back in If-None-Match to get a 304
+    while the tasks are unchanged.
     Returns tasks sorted by score with explanations.
     """
     try:
-        # Get all tasks from database
-        tasks = Task.objects.all()
-        
-        if not tasks.exists():
-            return Response(
-                {
-                    'suggestions': [],
-                    'message': 'No tasks found in database. Add tasks via admin or API.'
-                },
-                status=status.HTTP_200_OK
-            )
-        
-        # Convert to dict format for scoring
-        task_list = []
-        for task in tasks:
-            task_list.append({
-                'id': task.id,
-                'title': task.title,
-                'due_date': task.due_date.isoformat(),
-                'estimated_hours': task.estimated_hours,
-                'importance': task.importance,
-                'dependencies': task.dependencies if task.dependencies else [],
-            })
-        
-        # Get profile from query params
-        profile = request.query_params.get('profile', 'smart_balance')
-        
-        # Score tasks
-        engine = ScoringEngine(profile=profile)
-        result = engine.analyze_tasks(task_list, profile=profile)
-        
-        if result.get('errors'):
-            return Response(
-                {
-                    'error': 'Error analyzing tasks',
-                    'details': result['errors']
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        limit = int(request.query_params.get('limit', SUGGEST_MAX_TASKS))
+        offset = int(request.query_params.get('offset', 0))
+    except ValueError:
+        return Response(
+            {'error': 'limit and offset must be integers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if limit < 1 or offset < 0:
+        return Response(
+            {'error': 'limit must be positive and offset non-negative'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    limit = min(limit, SUGGEST_MAX_TASKS)
+    
+    # Get profile from query params
+    profile = request.query_params.get('profile', 'smart_balance')
+    
+    try:
+        # Scores only change with the tasks, the query, or the date (urgency)
+        state = Task.objects.aggregate(last_updated=Max('updated_at'), count=Count('id'))
+        version = hashlib.blake2b(
+            f"{state['last_updated']}:{state['count']}:{profile}:{limit}:{offset}:{date.today()}".encode(),
+            digest_size=8
+        ).hexdigest()
+        etag = f'"{version}"'
         
-        # Get top 3
-        top_tasks = result['tasks'][:3]
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+        if etag in (tag.strip() for tag in if_none_match.split(',')):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
         
-        # Generate summary explanation
-        if top_tasks:
-            explanations = []
-            for i, task in enumerate(top_tasks, 1):
-                explanations.append(f"{i}. {task['title']}: {task['explanation']}")
-            summary = " ".join(explanations)
-        else:
-            summary = "No tasks available for suggestions."
+        body, status_code = cache.get_or_set(
+            f'suggest:{version}',
+            lambda: _build_suggestions(limit, offset, profile),
+            timeout=SUGGEST_CACHE_TIMEOUT
+        )
         
+        response = Response(body, status=status_code)
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+    
+    except ValueError as e:
+        # Unknown profile
         return Response(
-            {
-                'suggestions': top_tasks,
-                'summary': summary,
-                'profile': result['profile']
-            },
-            status=status.HTTP_200_OK
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
         )
-    
-    except Exception as e:
+    except DatabaseError:
+        logger.exception("suggest_tasks failed to read tasks")
         return Response(
-            {'error': f'Internal server error: {str(e)}'},
+            {'error': 'Internal server error'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 